@@ -1,6 +1,7 @@
 import numpy as np
 import librosa
 import soundfile as sf
+from scipy.fft import rfft
 
 def detect_frequency(file_path, duration=60):
     """
@@ -14,27 +15,33 @@ def detect_frequency(file_path, duration=60):
         float: The dominant frequency in Hz.
     """
     try:
-        # Read audio file with soundfile (supports many formats)
-        audio_data, sample_rate = sf.read(file_path, always_2d=True)
-        
-        # Extract the first channel if the audio is stereo
-        audio_data = audio_data[:, 0]
+        # Read audio file with soundfile (supports many formats), decoding only
+        # the frames within the desired duration, directly as float32
+        with sf.SoundFile(file_path) as f:
+            sample_rate = f.samplerate
+            max_samples = int(sample_rate * duration)
+            audio_data = f.read(frames=max_samples, dtype='float32', always_2d=True)
 
-        # Truncate or pad the audio to the desired duration
-        max_samples = int(sample_rate * duration)
-        audio_data = audio_data[:max_samples] if len(audio_data) > max_samples else np.pad(
-            audio_data, (0, max_samples - len(audio_data)), 'constant'
-        )
+        # Extract the first channel if the audio is stereo
+        audio_data = np.ascontiguousarray(audio_data[:, 0])
 
         if len(audio_data) == 0:
             raise ValueError("Audio file contains no data or is too short for analysis.")
 
-        # Perform FFT on the audio data
-        fft_result = np.fft.rfft(audio_data)
-        freqs = np.fft.rfftfreq(len(audio_data), 1.0 / sample_rate)
-
-        # Find the dominant frequency
-        dominant_freq = freqs[np.argmax(np.abs(fft_result))]
+        # Perform FFT over the full analysis window, so bins are 1/duration Hz
+        # apart however short the file is; rfft zero-fills past the data
+        n = max_samples
+        fft_result = rfft(audio_data, n=n, workers=-1)
+
+        # Find the dominant frequency from the squared magnitude, reduced in
+        # place over the spectrum's interleaved (re, im) pairs so no new
+        # array is allocated; bin k of an n-point rfft sits at k * sample_rate / n Hz
+        pairs = fft_result.view(np.float32).reshape(-1, 2)
+        np.square(pairs, out=pairs)
+        power = pairs[:, 0]
+        power += pairs[:, 1]
+        idx = int(np.argmax(power))
+        dominant_freq = idx * sample_rate / n
         print(f"The dominant frequency is {dominant_freq:.2f} Hz.")
         return dominant_freq
 
@@ -6,6 +6,7 @@ Requirements
   pip install scipy   (embed mode only)
 """
 
+import functools
 import math
 import os
 import queue
@@ -56,7 +57,8 @@ import sounddevice as sd
 
 SR_DEFAULT         = 44100
 SR_HIGH            = 96000
-BLOCK_SIZE         = 4096
+BLOCK_SIZE         = 4096     # frames per callback at SR_DEFAULT (~93 ms)
+EMBED_CHUNK        = 65536
 PREFILL            = 4
 DTYPE              = "float32"
 FADE_S             = 4.0
@@ -918,33 +920,52 @@ _pink_lvl  = 0.0   # 0.0 = no pink noise, >0 = blend level
 # ---------------------------------------------------------------------------
 
 def _env(t0, n, fi, fo, tot):
-    e = np.ones(n, dtype=np.float32)
+    # Gain envelope: the output amplitude with fade ramps applied, so no
+    # separate normalisation pass is needed.  Ramps are built from integer
+    # sample counts (at most one fade long, so exact in float32) rather than
+    # interpolated with linspace.
+    e = np.full(n, _amplitude, dtype=np.float32)
     if fi > 0 and t0 < fi:
-        hi = min(t0+n, fi); k = hi-t0
-        e[:k] = np.linspace(t0/fi, hi/fi, k, endpoint=False, dtype=np.float32)
+        hi = min(t0+n, fi)
+        e[:hi-t0] = np.arange(t0, hi, dtype=np.float32) * (_amplitude/fi)
     if tot and fo > 0:
         fs = tot-fo
         if t0+n > fs:
-            lb  = max(0, fs-t0)
-            a0  = max(0.0, (tot-(t0+lb))/fo)
-            a1  = max(0.0, (tot-(t0+n))/fo)
-            e[lb:] *= np.linspace(a0, a1, n-lb, endpoint=False, dtype=np.float32)
+            lb = max(0, fs-t0)
+            e[lb:] *= np.arange(tot-t0-lb, tot-t0-n, -1, dtype=np.float32) / fo
     return e
 
-def _t(t0, n, sr):
-    return (np.arange(n, dtype=np.float64)+t0)/sr
-
-def _gate(t, beat, duty, sr, n):
-    gate = ((t*beat)%1.0 < duty).astype(np.float32)
-    tl   = min(int(sr*0.005), max(1, n//8))
+@functools.lru_cache(maxsize=32)
+def _rotor(f, n, sr):
+    """Unit phasors exp(i*2*pi*f*k/sr) for k in [0, n), shared by every block."""
+    k = np.arange(n, dtype=np.float64)
+    return np.exp(2j*np.pi*((f*k/sr)%1.0)).astype(np.complex64)
+
+def _osc(f, t0, n, sr, amp=1.0):
+    """Oscillator block at sample t0: .imag is amp*sin(2*pi*f*t), .real is
+    amp*cos.  The start phase is exact per block, so there is no drift across
+    blocks; amp rides on the start phasor at no per-sample cost."""
+    return _rotor(f, n, sr) * np.complex64(amp*np.exp(2j*np.pi*((f*t0/sr)%1.0)))
+
+@functools.lru_cache(maxsize=8)
+def _taper(tl):
+    return np.hanning(tl*2)[:tl].astype(np.float32)
+
+def _gate(t0, beat, duty, sr, n):
+    """On/off gate for samples [t0, t0+n) with tapered edges.  It is built
+    from tl samples earlier so an edge that falls on (or just before) a block
+    boundary is tapered the same whatever the block size."""
+    tl   = int(sr*0.005)
+    k    = np.arange(t0-tl, t0+n, dtype=np.float64)
+    gate = ((k/sr*beat)%1.0 < duty).astype(np.float32)
     if tl > 1:
-        tap  = np.hanning(tl*2)[:tl].astype(np.float32)
+        tap  = _taper(tl); m = len(gate)
         diff = np.diff(gate, prepend=gate[0])
         for i in np.where(diff>0)[0]:
-            j=min(i+tl,n); gate[i:j]*=tap[:j-i]
+            j=min(i+tl,m); gate[i:j]*=tap[:j-i]
         for i in np.where(diff<0)[0]:
-            j=min(i+tl,n); gate[i:j]*=tap[:j-i][::-1]
-    return gate
+            j=min(i+tl,m); gate[i:j]*=tap[:j-i][::-1]
+    return gate[tl:]
 
 def gen_pink_noise(n):
     """Pink noise via FFT spectral shaping (1/sqrt(f)), Garcia-Argibay 2018:
@@ -963,87 +984,93 @@ def stereo(m):
     return np.column_stack((m, m))
 
 def _apply_pink(stereo_blk, n):
-    """Blend pink noise into a stereo block according to global _pink_lvl."""
+    """Blend pink noise into a block (any channel count) according to global
+    _pink_lvl.  The block is scaled in place; pink is broadcast per channel."""
     if _pink_lvl <= 0.0:
         return stereo_blk
     pink  = gen_pink_noise(n)
-    pink2 = np.column_stack((pink, pink))
-    return stereo_blk * (1.0 - _pink_lvl) + pink2 * _pink_lvl
+    stereo_blk *= 1.0 - _pink_lvl
+    stereo_blk += (pink * (_pink_lvl*_amplitude))[:,None]
+    return stereo_blk
 
 def gen_binaural(carr, beat, t0, n, sr, fi, fo, tot):
-    t = _t(t0, n, sr); e = _env(t0, n, fi, fo, tot)
-    L = (np.sin(2*np.pi*carr*t)*e).astype(np.float32)
-    R = (np.sin(2*np.pi*(carr+beat)*t)*e).astype(np.float32)
-    return np.column_stack((L, R))
+    e   = _env(t0, n, fi, fo, tot)
+    blk = np.empty((n, 2), dtype=np.float32)
+    np.multiply(_osc(carr, t0, n, sr).imag, e, out=blk[:,0])
+    np.multiply(_osc(carr+beat, t0, n, sr).imag, e, out=blk[:,1])
+    return blk
 
 def gen_isochronic(carr, beat, t0, n, sr, duty, fi, fo, tot):
-    t = _t(t0, n, sr); e = _env(t0, n, fi, fo, tot)
-    m = (np.sin(2*np.pi*carr*t)*_gate(t, beat, duty, sr, n)*e).astype(np.float32)
+    e = _env(t0, n, fi, fo, tot)
+    m = _osc(carr, t0, n, sr).imag*_gate(t0, beat, duty, sr, n)*e
     return stereo(m)
 
 def gen_mono(carr, t0, n, sr, fi, fo, tot):
-    t = _t(t0, n, sr); e = _env(t0, n, fi, fo, tot)
-    return stereo((np.sin(2*np.pi*carr*t)*e).astype(np.float32))
+    e = _env(t0, n, fi, fo, tot)
+    return stereo(_osc(carr, t0, n, sr).imag*e)
 
 def gen_infrasonic(beat, t0, n, sr, fi, fo, tot):
     return gen_mono(beat, t0, n, sr, fi, fo, tot)
 
 def gen_subliminal(carr, beat, t0, n, sr, fi, fo, tot):
-    t  = _t(t0, n, sr); e = _env(t0, n, fi, fo, tot)
-    am = (1.0+np.cos(2*np.pi*beat*t))/2.0
-    return stereo((np.sin(2*np.pi*carr*t)*am*e).astype(np.float32))
+    e  = _env(t0, n, fi, fo, tot)
+    am = (1.0+_osc(beat, t0, n, sr).real)*0.5
+    return stereo(_osc(carr, t0, n, sr).imag*am*e)
 
 def gen_parametric(base, beat, t0, n, sr, fi, fo, tot):
-    t = _t(t0, n, sr); e = _env(t0, n, fi, fo, tot)
-    w = ((np.sin(2*np.pi*base*t)+np.sin(2*np.pi*(base+beat)*t))*0.5*e).astype(np.float32)
+    e = _env(t0, n, fi, fo, tot)
+    w = (_osc(base, t0, n, sr, 0.5).imag+_osc(base+beat, t0, n, sr, 0.5).imag)*e
     return stereo(w)
 
 def gen_surround(carr, beat, t0, n, sr, nch, duty, fi, fo, tot):
     blk = gen_isochronic(carr, beat, t0, n, sr, duty, fi, fo, tot)
     return np.tile(blk[:,0:1], (1, nch))
 
-def norm(b):
-    p = np.max(np.abs(b))
-    b = b/p if p > 1.0 else b
-    return (b * _amplitude).astype(np.float32)
-
 # ---------------------------------------------------------------------------
 #  PRODUCER + PLAYBACK
 # ---------------------------------------------------------------------------
 
+def _block_gen(p, sr, fi, total, nch):
+    """Bind the preset to its generator once; the result is called as gen(t0, n)."""
+    kw = dict(sr=sr, fi=fi, fo=fi, tot=total)
+    c, b, m = p["carrier_hz"], p["beat_hz"], p["mode"]
+    if   m=="binaural":   return functools.partial(gen_binaural, c, b, **kw)
+    elif m=="isochronic": return functools.partial(gen_isochronic, c, b, duty=p["duty"], **kw)
+    elif m=="mono":       return functools.partial(gen_mono, c, **kw)
+    elif m=="infrasonic": return functools.partial(gen_infrasonic, b, **kw)
+    elif m=="subliminal": return functools.partial(gen_subliminal, c, b, **kw)
+    elif m=="parametric": return functools.partial(gen_parametric, c, b, **kw)
+    elif m=="surround":   return functools.partial(gen_surround, c, b, nch=nch, duty=p["duty"], **kw)
+    else:                 return functools.partial(gen_mono, c, **kw)
+
+def block_size(sr):
+    """Frames per block, scaled so higher sample rates keep the same ~93 ms
+    callback period instead of running the Python callback 2-4x as often."""
+    return BLOCK_SIZE * max(1, sr // SR_DEFAULT)
+
 def producer(p, q, stop_ev, sr, total=None, nch=2):
-    fi = int(FADE_S*sr); t0 = 0
+    fi  = int(FADE_S*sr); t0 = 0; bs = block_size(sr)
+    gen = _block_gen(p, sr, fi, total, nch)
     while not stop_ev.is_set():
         if total and t0 >= total:
             q.put(None); break
-        fill = BLOCK_SIZE if not total else min(BLOCK_SIZE, total-t0)
-        kw   = dict(t0=t0, n=fill, sr=sr, fi=fi, fo=fi, tot=total)
-        m    = p["mode"]
-        if   m=="binaural":   blk=gen_binaural(p["carrier_hz"],p["beat_hz"],**kw)
-        elif m=="isochronic": blk=gen_isochronic(p["carrier_hz"],p["beat_hz"],duty=p["duty"],**kw)
-        elif m=="mono":       blk=gen_mono(p["carrier_hz"],**kw)
-        elif m=="infrasonic": blk=gen_infrasonic(p["beat_hz"],**kw)
-        elif m=="subliminal": blk=gen_subliminal(p["carrier_hz"],p["beat_hz"],**kw)
-        elif m=="parametric": blk=gen_parametric(p["carrier_hz"],p["beat_hz"],**kw)
-        elif m=="surround":   blk=gen_surround(p["carrier_hz"],p["beat_hz"],
-                                               t0,fill,sr,nch,p["duty"],fi,fi,total)
-        else:                 blk=gen_mono(p["carrier_hz"],**kw)
-        blk = _apply_pink(blk, fill)
-        blk = norm(blk)
-        if fill < BLOCK_SIZE:
-            blk = np.vstack((blk, np.zeros((BLOCK_SIZE-fill,blk.shape[1]),dtype=np.float32)))
+        fill = bs if not total else min(bs, total-t0)
+        blk  = _apply_pink(gen(t0, fill), fill)
         q.put(blk); t0 += fill
 
 def make_cb(q):
     def cb(out, frames, ti, st):
         try:   blk = q.get_nowait()
-        except queue.Empty: out[:] = 0; return
+        except queue.Empty: out.fill(0); return
         if blk is None: raise sd.CallbackStop()
-        out[:] = blk.reshape(out.shape)
+        k = len(blk)
+        out[:k] = blk                      # final block of a timed session
+        if k < frames: out[k:] = 0         # may be short; pad here, not upstream
     return cb
 
 def prefill(q, n=PREFILL//2):
-    while q.qsize() < n: pass
+    # Sleep between polls: a bare spin holds the GIL the producer needs.
+    while q.qsize() < n: time.sleep(0.001)
 
 def get_nch():
     try:
@@ -1067,10 +1094,12 @@ _MILESTONES = [
 ]
 _milestones_fired = set()
 
-def progress_thread(min_s, total_s):
+def progress_thread(min_s, total_s, pretask=0.0):
+    """Progress line, milestones and (if pretask > 0) the begin-task alert."""
     global _t0_wall
     _t0_wall = time.time()
     _milestones_fired.clear()
+    alert = pretask > 0
     while not stop_event.is_set():
         e   = time.time() - _t0_wall
         pct = min(e/min_s*100, 100) if min_s > 0 else 100
@@ -1083,6 +1112,14 @@ def progress_thread(min_s, total_s):
                 _milestones_fired.add(ts)
                 sys.stdout.write(f"\n  *** MILESTONE: {label}\n  ")
                 sys.stdout.flush()
+        if alert and e >= pretask:
+            alert = False
+            sys.stdout.write(
+                f"\n\n  ╔══════════════════════════════════╗\n"
+                f"  ║  >>> BEGIN YOUR TASK NOW <<<     ║\n"
+                f"  ║  Pre-task induction complete      ║\n"
+                f"  ╚══════════════════════════════════╝\n\n  ")
+            sys.stdout.flush()
         time.sleep(1)
     sys.stdout.write("\n")
 
@@ -1098,25 +1135,12 @@ def run_session(p, duration, sr, pretask=0.0):
     thr = threading.Thread(target=producer, args=(p,q,sev,sr,total,nch), daemon=True)
     thr.start(); prefill(q)
     threading.Thread(target=progress_thread,
-                     args=(MIN.get(p["band"],0), duration if duration else None),
+                     args=(MIN.get(p["band"],0), duration if duration else None, pretask),
                      daemon=True).start()
 
-    if pretask > 0:
-        # Start a thread to fire the pre-task alert
-        def _pretask_alert():
-            time.sleep(pretask)
-            if not stop_event.is_set():
-                sys.stdout.write(
-                    f"\n\n  ╔══════════════════════════════════╗\n"
-                    f"  ║  >>> BEGIN YOUR TASK NOW <<<     ║\n"
-                    f"  ║  Pre-task induction complete      ║\n"
-                    f"  ╚══════════════════════════════════╝\n\n  ")
-                sys.stdout.flush()
-        threading.Thread(target=_pretask_alert, daemon=True).start()
-
     ch = nch if p["mode"]=="surround" else 2
     with sd.OutputStream(samplerate=sr, channels=ch,
-                         blocksize=BLOCK_SIZE, dtype=DTYPE, callback=make_cb(q)):
+                         blocksize=block_size(sr), dtype=DTYPE, callback=make_cb(q)):
         if total:
             sd.sleep(int(duration*1000)); local.set()
         else:
@@ -1174,15 +1198,21 @@ def run_embed():
 
         sr, data = wavfile.read(inp)
         orig = data.dtype
+        data = data.astype(np.float32, copy=False)
         if np.issubdtype(orig, np.integer):
-            data = data.astype(np.float32) / np.iinfo(orig).max
-        else:
-            data = data.astype(np.float32)
-
-        t   = np.arange(data.shape[0], dtype=np.float64) / sr
-        env = 1.0 + depth * np.sin(2*np.pi*beat*t)
-        mod = np.clip(data * (env[:,np.newaxis] if data.ndim>1 else env), -1.0, 1.0).astype(np.float32)
-        wavfile.write(out, sr, mod)
+            data /= np.iinfo(orig).max
+
+        # Modulate in place, one chunk at a time, so no full-length phase or
+        # envelope arrays are built.  The phase is reduced to one cycle in
+        # float64, then the sine is taken in float32 so NumPy dispatches its
+        # SIMD single-precision kernel.
+        frames = data if data.ndim > 1 else data[:,np.newaxis]
+        for i in range(0, frames.shape[0], EMBED_CHUNK):
+            blk = frames[i:i+EMBED_CHUNK]
+            ph  = (np.arange(i, i+blk.shape[0], dtype=np.float64) * (beat/sr)) % 1.0
+            blk *= (1.0 + depth * np.sin(2*np.pi*ph, dtype=np.float32))[:,np.newaxis]
+            np.clip(blk, -1.0, 1.0, out=blk)
+        wavfile.write(out, sr, data)
 
         print()
         print(f"  Written to      : {out}")
@@ -1219,6 +1249,17 @@ def ask_float(prompt):
             if v > 0: return v
         except ValueError: pass
 
+def ask_hms():
+    """Hours, minutes, seconds (blank = 0) as total seconds.  A bad entry
+    re-asks that field instead of silently zeroing the rest."""
+    total = 0
+    for prompt, scale in (("  Hours   : ", 3600), ("  Minutes : ", 60), ("  Seconds : ", 1)):
+        while True:
+            try:
+                total += int(input(prompt).strip() or 0) * scale; break
+            except ValueError: pass
+    return total
+
 def choose_amplitude():
     global _amplitude
     print()
@@ -1342,24 +1383,11 @@ def choose_duration(p):
     if c == 3:
         print()
         print("  Enter pre-task induction duration:")
-        h = m = s = 0
-        try:
-            h = int(input("  Hours   : ").strip() or 0)
-            m = int(input("  Minutes : ").strip() or 0)
-            s = int(input("  Seconds : ").strip() or 0)
-        except ValueError: pass
-        pretask = float(h*3600 + m*60 + s)
-        if pretask <= 0: pretask = 0.0
+        pretask = float(max(0, ask_hms()))
         print()
         print("  Now enter total session duration (induction + task):")
 
-    h = m = s = 0
-    try:
-        h = int(input("  Hours   : ").strip() or 0)
-        m = int(input("  Minutes : ").strip() or 0)
-        s = int(input("  Seconds : ").strip() or 0)
-    except ValueError: pass
-    total = h*3600 + m*60 + s
+    total = ask_hms()
     if total <= 0:
         print("  Zero entered.  Switching to continuous.")
         return 0.0, pretask